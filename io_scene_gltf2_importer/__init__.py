@@ -46,20 +46,28 @@ class ImportglTF2(Operator, ImportHelper):
     bl_label  = "Import glTF2"
 
     loglevel = bpy.props.EnumProperty(items=Log.getLevels(), description="Log Level", default=Log.default())
+    use_mmap = bpy.props.BoolProperty(name="Memory Map Files", description="Map binary data instead of loading it in memory", default=True)
+    max_influences = bpy.props.IntProperty(name="Max Bone Influences", description="Maximum number of bones per vertex, 0 for no limit", default=0, min=0)
+    weight_threshold = bpy.props.FloatProperty(name="Weight Threshold", description="Bone weights lower than this value are dropped", default=0.0, min=0.0, max=1.0)
+    weight_steps = bpy.props.IntProperty(name="Weight Steps", description="Bone weights are rounded to multiples of 1 / steps, 0 for no rounding", default=255, min=0)
 
     def execute(self, context):
         return self.import_gltf2(context)
 
     def import_gltf2(self, context):
         bpy.context.scene.render.engine = 'CYCLES'
-        self.gltf = glTFImporter(self.filepath, self.loglevel)
+        self.gltf = glTFImporter(self.filepath, self.loglevel, self.use_mmap, max_influences=self.max_influences, weight_threshold=self.weight_threshold, weight_steps=self.weight_steps)
         self.gltf.log.critical("Starting loading glTF file")
-        success, txt = self.gltf.read()
-        if not success:
-            self.report({'ERROR'}, txt)
-            return {'CANCELLED'}
-        self.gltf.log.critical("Data are loaded, start creating Blender stuff")
-        self.gltf.blender_create()
+        try:
+            success, txt = self.gltf.read()
+            if not success:
+                self.report({'ERROR'}, txt)
+                return {'CANCELLED'}
+            self.gltf.log.critical("Data are loaded, start creating Blender stuff")
+            self.gltf.blender_create()
+        finally:
+            # Mapped files are closed even if import failed
+            self.gltf.close()
         self.gltf.debug_missing()
         self.gltf.log.critical("glTF import is now finished")
         self.gltf.log.removeHandler(self.gltf.log_handler)
@@ -50,8 +50,9 @@ class AnimationBone():
             for channel in self.animation.anims[anim]:
                 if channel.path == "translation":
                     blender_path = "location"
-                    for key in channel.data:
-                        transform = Matrix.Translation(self.animation.gltf.convert.location(list(key[1])))
+                    locations = self.animation.gltf.convert.locations(channel.sampler.output.data).tolist()
+                    for key, location in zip(channel.data, locations):
+                        transform = Matrix.Translation(location)
                         if not self.animation.node.parent:
                             mat = transform * delta.to_matrix().to_4x4()
                         else:
@@ -76,8 +77,9 @@ class AnimationBone():
 
                 elif channel.path == "rotation":
                     blender_path = "rotation_quaternion"
-                    for key in channel.data:
-                        transform = (self.animation.gltf.convert.quaternion(key[1])).to_matrix().to_4x4()
+                    quaternions = self.animation.gltf.convert.quaternions(channel.sampler.output.data).tolist()
+                    for key, quaternion in zip(channel.data, quaternions):
+                        transform = Quaternion(quaternion).to_matrix().to_4x4()
                         if not self.animation.node.parent:
                             mat = transform * delta.to_matrix().to_4x4()
                         else:
@@ -48,8 +48,9 @@ class AnimationNode():
 
                     if channel.path == "translation":
                         blender_path = "location"
-                        for key in channel.data:
-                           obj.location = Vector(self.animation.gltf.convert.location(list(key[1])))
+                        locations = self.animation.gltf.convert.locations(channel.sampler.output.data).tolist()
+                        for key, location in zip(channel.data, locations):
+                           obj.location = Vector(location)
                            obj.keyframe_insert(blender_path, frame = key[0] * fps, group='location')
 
                         # Setting interpolation
@@ -59,8 +60,9 @@ class AnimationNode():
 
                     elif channel.path == "rotation":
                         blender_path = "rotation_quaternion"
-                        for key in channel.data:
-                            obj.rotation_quaternion = self.animation.gltf.convert.quaternion(key[1])
+                        quaternions = self.animation.gltf.convert.quaternions(channel.sampler.output.data).tolist()
+                        for key, quaternion in zip(channel.data, quaternions):
+                            obj.rotation_quaternion = Quaternion(quaternion)
                             obj.keyframe_insert(blender_path, frame = key[0] * fps, group='rotation')
 
                         # Setting interpolation
@@ -71,8 +73,9 @@ class AnimationNode():
 
                     elif channel.path == "scale":
                         blender_path = "scale"
-                        for key in channel.data:
-                            obj.scale = Vector(self.animation.gltf.convert.scale(list(key[1])))
+                        scales = self.animation.gltf.convert.scales(channel.sampler.output.data).tolist()
+                        for key, scale in zip(channel.data, scales):
+                            obj.scale = Vector(scale)
                             obj.keyframe_insert(blender_path, frame = key[0] * fps, group='scale')
 
                         # Setting interpolation
@@ -33,33 +33,18 @@ class Sampler():
 
     def read(self):
         self.interpolation = self.json['interpolation']
-        self.input  = Accessor(self.json['input'], self.gltf.json['accessors'][self.json['input']], self.gltf)
-        self.output = Accessor(self.json['output'], self.gltf.json['accessors'][self.json['output']], self.gltf)
-        input_data  = self.input.read()
-        output_data = self.output.read()
-
-        self.input.debug_missing()
-        self.output.debug_missing()
-
-        anim_data = []
+        self.input  = self.gltf.read_accessor(self.json['input'])
+        self.output = self.gltf.read_accessor(self.json['output'])
+        input_data  = self.input.data
+        output_data = self.output.data
 
         if self.channels == 0:
-            cpt_idx = 0
-            for i in input_data:
-                anim_data.append(tuple([input_data[cpt_idx][0], output_data[cpt_idx]]))
-                cpt_idx += 1
-
-            return anim_data
+            return list(zip(input_data[:, 0].tolist(), output_data.tolist()))
 
         else:
-
+            anim_data = []
             for chan in range(0, self.channels):
-                anim_data_chan = []
-                cpt_idx = 0
-                for i in input_data:
-                    anim_data_chan.append(tuple([input_data[cpt_idx][0], output_data[cpt_idx*self.channels+chan][0]]))
-                    cpt_idx += 1
-                anim_data.append(anim_data_chan)
+                anim_data.append(list(zip(input_data[:, 0].tolist(), output_data[chan::self.channels, 0].tolist())))
 
             return anim_data
 
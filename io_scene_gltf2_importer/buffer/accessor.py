@@ -21,59 +21,71 @@
  * This development is done in strong collaboration with Airbus Defence & Space
  """
 
-import struct
+import numpy as np
 from .bufferview import *
 from .sparse import *
 
 
 class Accessor():
     def __init__(self, index, json, gltf):
+        self.index = index
         self.json  = json   # Accessor json
         self.gltf =  gltf # Reference to global glTF instance
         self.name = None
+        self.data = None
 
     def read(self):
-        if not 'bufferView' in self.json:
-            return
-
         if 'name' in self.json.keys():
             self.name = self.json['name']
 
-        self.bufferView = BufferView(self.json['bufferView'], self.gltf.json['bufferViews'][self.json['bufferView']], self.gltf)
-        self.bufferView.read()
-        self.bufferView.debug_missing()
+        dtype = np.dtype('<' + self.gltf.fmt_char_dict[self.json['componentType']])
+        component_nb = self.gltf.component_nb_dict[self.json['type']]
 
-        fmt_char = self.gltf.fmt_char_dict[self.json['componentType']]
-        component_size = struct.calcsize(fmt_char)
+        if 'bufferView' in self.json.keys():
+            self.bufferView = BufferView(self.json['bufferView'], self.gltf.json['bufferViews'][self.json['bufferView']], self.gltf)
+            self.bufferView.read()
+            self.bufferView.debug_missing()
 
-        component_nb = self.gltf.component_nb_dict[self.json['type']]
-        fmt = '<' + (fmt_char * component_nb)
+            # TODO data alignment stuff
 
-        stride = struct.calcsize(fmt)
+            if 'byteOffset' in self.json.keys():
+                offset = self.json['byteOffset']
+            else:
+                offset = 0
 
-        # TODO data alignment stuff
+            if 'byteStride' in self.bufferView.json.keys():
+                self.data = self.bufferView.read_interleaved(self.index)
+            if self.data is None:
+                self.data = self.bufferView.read_data(dtype, component_nb, self.json['count'], offset)
 
-        if 'byteOffset' in self.json.keys():
-            offset = self.json['byteOffset']
         else:
-            offset = 0
+            # No bufferView : accessor is initialized with zeros
+            self.data = np.zeros((self.json['count'], component_nb), dtype=dtype)
 
         if 'sparse' in self.json.keys():
             self.sparse = Sparse(self.json['componentType'], self.json['type'], self.json['sparse'], self.gltf)
             self.sparse.read()
             self.sparse.debug_missing()
-            self.data = self.bufferView.read_data(fmt, stride, self.json['count'], offset)
             self.apply_sparse()
-            return self.data
 
-        else:
-            return self.bufferView.read_data(fmt, stride, self.json['count'], offset)
+        if 'normalized' in self.json.keys() and self.json['normalized'] == True:
+            self.dequantize()
+
+        return self.data
 
     def apply_sparse(self):
-        cpt_idx = 0
-        for idx in self.sparse.indices:
-            self.data[idx[0]] = self.sparse.data[cpt_idx]
-            cpt_idx += 1
+        # Copy on write : data may be a view on buffer, shared with other accessors
+        if self.data.base is not None:
+            self.data = self.data.copy()
+
+        self.data[self.sparse.indices] = self.sparse.data
+
+    def dequantize(self):
+        # Normalized integers are mapped to [0, 1] (unsigned) or [-1, 1] (signed)
+        info = np.iinfo(self.data.dtype)
+        self.data = np.multiply(self.data, 1.0 / info.max, dtype=np.float32)
+        if info.min < 0:
+            np.maximum(self.data, -1.0, out=self.data)
 
     def debug_missing(self):
         keys = [
@@ -85,6 +97,7 @@ class Accessor():
                 'min', #TODO :  add some checks ?
                 'max', #TODO :  add some checks ?
                 'name',
+                'normalized',
                 'sparse'
                 ]
 
@@ -22,7 +22,30 @@
  """
 
 import base64
-from os.path import dirname, join
+
+BASE64_CHUNK_SIZE = 4 * 1024 * 1024 # in base64 characters, must be a multiple of 4
+
+def decode_base64(uri, start):
+    # Decode chunk by chunk into a preallocated buffer,
+    # so that only one small slice of the uri is copied at a time
+    length = len(uri) - start
+    if length % 4 != 0:
+        return base64.b64decode(uri[start:])
+
+    padding = 0
+    if length > 0 and uri[-1] == '=':
+        padding += 1
+        if uri[-2] == '=':
+            padding += 1
+
+    data = bytearray(length // 4 * 3 - padding)
+    data_offset = 0
+    for offset in range(start, len(uri), BASE64_CHUNK_SIZE):
+        chunk = base64.b64decode(uri[offset:offset + BASE64_CHUNK_SIZE])
+        data[data_offset:data_offset + len(chunk)] = chunk
+        data_offset += len(chunk)
+
+    return data
 
 class Buffer():
     def __init__(self, index, json, gltf):
@@ -42,13 +65,14 @@ class Buffer():
             if self.json['uri'][:5] == 'data:':
                 idx = self.json['uri'].find(sep)
                 if idx != -1:
-                    data = self.json['uri'][idx+len(sep):]
-                    self.data = base64.b64decode(data)
+                    self.data = decode_base64(self.json['uri'], idx+len(sep))
+                    # Release the uri string, only decoded data are needed now
+                    del self.json['uri']
                     return
 
 
-            with open(join(dirname(self.gltf.filename), self.json['uri']), 'rb') as f_:
-                self.data = f_.read()
+            # Only accessed ranges of the file are paged in
+            self.data = self.gltf.read_file(self.json['uri'], mapped=True)
 
     def debug_missing(self):
         keys = [
@@ -21,7 +21,7 @@
  * This development is done in strong collaboration with Airbus Defence & Space
  """
 
-import struct
+import numpy as np
 from .buffer import *
 
 class BufferView():
@@ -40,31 +40,80 @@ class BufferView():
         self.buffer = self.gltf.buffers[self.json['buffer']]
         self.buffer.debug_missing()
 
-    def read_data(self, fmt, stride_, count, accessor_offset):
-        data = []
-
+    def read_data(self, dtype, component_nb, count, accessor_offset):
         if 'byteOffset' in self.json.keys():
             bufferview_offset = self.json['byteOffset']
         else:
             bufferview_offset = 0
 
-        length = self.json['byteLength']
+        element_size = dtype.itemsize * component_nb
 
         if 'byteStride' in self.json.keys():
             stride = self.json['byteStride']
         else:
-            stride = stride_
+            stride = element_size
+
+        offset = bufferview_offset + accessor_offset
+
+        if stride == element_size:
+            # Tightly packed : direct view on buffer
+            data = np.frombuffer(self.buffer.data, dtype=dtype, count=count * component_nb, offset=offset)
+            return data.reshape(count, component_nb)
+
+        # Interleaved : strided view on buffer
+        return np.ndarray(shape=(count, component_nb), dtype=dtype, buffer=self.buffer.data, offset=offset, strides=(stride, dtype.itemsize))
+
+    def read_interleaved(self, accessor_id):
+        # All accessors interleaved in this bufferView are decoded together,
+        # as fields of a single structured array
+        if self.index not in self.gltf.interleaved.keys():
+            self.gltf.interleaved[self.index] = self.read_structured()
+
+        data = self.gltf.interleaved[self.index]
+        field = 'accessor_' + str(accessor_id)
+        if data is None or field not in data.dtype.names:
+            return None
+
+        return data[field][:self.gltf.json['accessors'][accessor_id]['count']]
+
+    def read_structured(self):
+        if 'byteOffset' in self.json.keys():
+            bufferview_offset = self.json['byteOffset']
+        else:
+            bufferview_offset = 0
+
+        stride = self.json['byteStride']
+
+        names   = []
+        formats = []
+        offsets = []
+        count   = 0
+        for accessor_id in self.gltf.get_bufferview_accessors(self.index):
+            accessor = self.gltf.json['accessors'][accessor_id]
+
+            dtype = np.dtype('<' + self.gltf.fmt_char_dict[accessor['componentType']])
+            component_nb = self.gltf.component_nb_dict[accessor['type']]
+
+            if 'byteOffset' in accessor.keys():
+                offset = accessor['byteOffset']
+            else:
+                offset = 0
+
+            if offset + dtype.itemsize * component_nb > stride:
+                continue
 
-        slice = self.buffer.data[bufferview_offset:bufferview_offset + length]
+            names.append('accessor_' + str(accessor_id))
+            formats.append((dtype, (component_nb,)))
+            offsets.append(offset)
+            count = max(count, accessor['count'])
 
+        if len(names) == 0:
+            return None
 
-        offset = accessor_offset
-        while len(data) < count:
-            element = struct.unpack_from(fmt, slice , offset)
-            data.append(element)
-            offset += stride
+        itemsize = max([offset + dtype.itemsize * shape[0] for (dtype, shape), offset in zip(formats, offsets)])
+        structured = np.dtype({'names': names, 'formats': formats, 'offsets': offsets, 'itemsize': itemsize})
 
-        return data
+        return np.ndarray(shape=(count,), dtype=structured, buffer=self.buffer.data, offset=bufferview_offset, strides=(stride,))
 
     def read_binary_data(self):
         if 'byteOffset' in self.json.keys():
@@ -74,7 +123,7 @@ class BufferView():
 
         length = self.json['byteLength']
 
-        return self.buffer.data[bufferview_offset:bufferview_offset + length]
+        return memoryview(self.buffer.data)[bufferview_offset:bufferview_offset + length]
 
 
     def debug_missing(self):
@@ -21,7 +21,21 @@
  * This development is done in strong collaboration with Airbus Defence & Space
  """
 
+import gc
 import json
+import mmap
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from os.path import dirname, join
+
+# Use a faster json parser if one is available
+try:
+    import orjson as json_backend
+except ImportError:
+    try:
+        import ujson as json_backend
+    except ImportError:
+        json_backend = None
 
 from ..scene import *
 from ..animation import *
@@ -40,9 +54,14 @@ class BlenderData():
 
 class glTFImporter():
 
-    def __init__(self, filename, loglevel):
+    def __init__(self, filename, loglevel, use_mmap=True, max_influences=0, weight_threshold=0.0, weight_steps=255):
         self.filename = filename
+        self.use_mmap = use_mmap
+        self.max_influences = max_influences # bones per vertex, 0 for no limit
+        self.weight_threshold = weight_threshold # lower normalized weights are dropped
+        self.weight_steps = weight_steps # weights are rounded to multiples of 1 / weight_steps, 0 for no rounding
         self.other_scenes = []
+        self.scenes = {}
 
         self.convert = Conversion()
 
@@ -51,14 +70,21 @@ class glTFImporter():
         self.log_handler = log.hdlr
 
         self.buffers = {}
+        self.accessors = {} # decoded accessors, each accessor is decoded once
+        self.bufferview_accessors = None
+        self.interleaved = {} # structured arrays of interleaved bufferViews
+        self.meshes = {} # (mesh, skin) or (mesh, skin, node) => Mesh
         self.materials = {}
         self.default_material = None
         self.skins = {}
         self.images = {}
         self.animations = {}
+        self.mappings = []
+        self.prefetched = {} # uri => future of file content
 
         self.extensions_managed = [
-            "KHR_materials_pbrSpecularGlossiness"
+            "KHR_materials_pbrSpecularGlossiness",
+            "KHR_mesh_quantization"
         ]
 
         self.load()
@@ -92,7 +118,7 @@ class glTFImporter():
 
         # json
         type, str_json, offset = self.load_chunk(offset)
-        self.json = json.loads(str_json.decode('utf-8'))
+        self.json = self.load_json(str_json)
 
         # binary data
         chunk_cpt = 0
@@ -114,23 +140,122 @@ class glTFImporter():
 
         return data_type, data, offset + 8 + data_length
 
-    def load(self):
-        with open(self.filename, 'rb') as f:
-            self.content = f.read()
+    def map_file(self, f):
+        if self.use_mmap:
+            try:
+                mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                self.mappings.append(mapping)
+                return memoryview(mapping)
+            except (ValueError, OSError):
+                # File can't be mapped (empty file, special filesystem...), read it instead
+                pass
 
+        f.seek(0)
+        return memoryview(f.read())
 
-        self.is_glb_format = self.content[:4] == b'glTF'
+    def load_json(self, content):
+        if json_backend is None:
+            return json.loads(str(content, 'utf-8'))
 
-        if not self.is_glb_format:
-            self.content = None
-            with open(self.filename, 'r') as f:
+        if json_backend.__name__ == 'orjson':
+            return json_backend.loads(content) # Can decode directly from memoryview
+
+        return json_backend.loads(bytes(content))
+
+    def load(self):
+        with open(self.filename, 'rb') as f:
+            self.is_glb_format = f.read(4) == b'glTF'
+            if self.is_glb_format:
+                # Chunks are memoryviews on the mapping, no copy of binary data
+                self.content = self.map_file(f)
+            else:
+                f.seek(0)
                 content = f.read()
-                self.json = json.loads(content)
+
+        if not self.is_glb_format:
+            self.json = self.load_json(content)
 
         else:
             # Parsing glb file
             self.load_glb()
 
+        self.index_graph()
+        self.prefetch()
+
+    def index_graph(self):
+        # Scene graph index, built once, to avoid scanning nodes and skins
+        self.node_parents = {} # node => parent node
+        self.node_scenes  = {} # node => scenes
+        self.joint_skins  = {} # joint node => skins
+        self.morph_nodes  = set() # nodes with their own morph targets weights
+
+        if 'nodes' in self.json.keys():
+            for node_idx, node in enumerate(self.json['nodes']):
+                if 'children' in node.keys():
+                    for child in node['children']:
+                        self.node_parents[child] = node_idx
+                if 'weights' in node.keys():
+                    self.morph_nodes.add(node_idx)
+
+        if 'skins' in self.json.keys():
+            for skin_idx, skin in enumerate(self.json['skins']):
+                if 'joints' in skin.keys():
+                    for joint in skin['joints']:
+                        self.joint_skins.setdefault(joint, []).append(skin_idx)
+
+        self.joints = set(self.joint_skins.keys())
+
+        if 'animations' in self.json.keys():
+            for anim in self.json['animations']:
+                for channel in anim.get('channels', []):
+                    if channel['target']['path'] == 'weights' and 'node' in channel['target'].keys():
+                        self.morph_nodes.add(channel['target']['node'])
+
+        if 'scenes' in self.json.keys():
+            for scene_idx, scene in enumerate(self.json['scenes']):
+                if 'nodes' not in scene.keys():
+                    continue
+                nodes = list(scene['nodes'])
+                while len(nodes) > 0:
+                    node_idx = nodes.pop()
+                    self.node_scenes.setdefault(node_idx, []).append(scene_idx)
+                    if 'children' in self.json['nodes'][node_idx].keys():
+                        nodes.extend(self.json['nodes'][node_idx]['children'])
+
+    def prefetch(self):
+        # Read external files in background, while nodes and accessors are read
+        uris = []
+        if not self.is_glb_format and 'buffers' in self.json.keys():
+            for buffer in self.json['buffers']:
+                if 'uri' in buffer.keys() and buffer['uri'][:5] != 'data:':
+                    uris.append((buffer['uri'], True))
+
+        if 'images' in self.json.keys():
+            for image in self.json['images']:
+                if 'uri' in image.keys() and image['uri'][:5] != 'data:':
+                    uris.append((image['uri'], False))
+
+        if len(uris) == 0:
+            return
+
+        executor = ThreadPoolExecutor(max_workers=min(len(uris), 8))
+        for uri, mapped in uris:
+            if uri not in self.prefetched.keys():
+                self.prefetched[uri] = executor.submit(self.load_file, uri, mapped)
+        executor.shutdown(wait=False)
+
+    def read_file(self, uri, mapped=False):
+        if uri in self.prefetched.keys():
+            return self.prefetched.pop(uri).result()
+
+        return self.load_file(uri, mapped)
+
+    def load_file(self, uri, mapped):
+        with open(join(dirname(self.filename), uri), 'rb') as f:
+            if mapped:
+                return self.map_file(f)
+            return f.read()
+
 
     def get_root_scene(self):
         if 'scene' in self.json.keys():
@@ -172,6 +297,7 @@ class glTFImporter():
                     # Non blocking error
 
         self.scene = Scene(idx, scene, self)
+        self.scenes[idx] = self.scene
         self.scene.read()
         self.scene.debug_missing()
 
@@ -181,6 +307,7 @@ class glTFImporter():
             if scene_idx == idx:
                 continue
             scene = Scene(scene_idx, self.json['scenes'][scene_idx] , self)
+            self.scenes[scene_idx] = scene
             scene.read()
             scene.debug_missing()
             scene_idx += 1
@@ -213,20 +340,50 @@ class glTFImporter():
 
         return True, None # Success
 
+    def read_accessor(self, accessor_id):
+        if accessor_id in self.accessors.keys():
+            return self.accessors[accessor_id]
+
+        accessor = Accessor(accessor_id, self.json['accessors'][accessor_id], self)
+        accessor.read()
+        accessor.debug_missing()
+        self.accessors[accessor_id] = accessor
+
+        return accessor
+
+    def get_bufferview_accessors(self, bufferview_id):
+        if self.bufferview_accessors is None:
+            self.bufferview_accessors = {}
+            for accessor_id, accessor in enumerate(self.json['accessors']):
+                if 'bufferView' in accessor.keys():
+                    self.bufferview_accessors.setdefault(accessor['bufferView'], []).append(accessor_id)
+
+        return self.bufferview_accessors.get(bufferview_id, [])
+
+    def get_node_depth(self, node_id):
+        depth = 0
+        while node_id in self.node_parents.keys():
+            node_id = self.node_parents[node_id]
+            depth += 1
+        return depth
+
     def get_node(self, node_id):
-        if node_id in self.scene.nodes.keys():
-            return self.scene.nodes[node_id]
-        for scene in self.other_scenes:
-            if node_id in scene.nodes.keys():
-                return scene.nodes[node_id]
+        if node_id not in self.node_scenes.keys():
+            return None
+        for scene_idx in self.node_scenes[node_id]:
+            if scene_idx in self.scenes.keys() and node_id in self.scenes[scene_idx].nodes.keys():
+                return self.scenes[scene_idx].nodes[node_id]
 
     def is_node_joint(self, node_id):
-        is_joint = False
-        for skin in self.skins.values():
-            if node_id in skin.bones:
-                return True, skin.index
+        if node_id not in self.joints:
+            return False, None
 
-        return is_joint, None
+        # Only skins used by a mesh are managed
+        for skin_id in self.joint_skins[node_id]:
+            if skin_id in self.skins.keys():
+                return True, skin_id
+
+        return False, None
 
 
     def blender_create(self):
@@ -236,6 +393,36 @@ class glTFImporter():
             scene.blender_create()
 
 
+    def close(self):
+        # Binary data are not needed anymore once Blender data are created
+        for future in self.prefetched.values():
+            future.cancel()
+        self.prefetched = {}
+        self.accessors = {}
+        self.interleaved = {}
+        for buffer in self.buffers.values():
+            buffer.data = None
+        self.buffers = {}
+
+        # Scene graph keeps decoded data, that can be views on mapped files
+        self.scene = None
+        self.scenes = {}
+        self.other_scenes = []
+        self.meshes = {}
+        self.skins = {}
+        self.animations = {}
+        self.materials = {}
+        self.default_material = None
+        self.images = {}
+        gc.collect() # Nodes and glTF instance reference each other
+
+        for mapping in self.mappings:
+            try:
+                mapping.close()
+            except BufferError:
+                self.log.warning("Mapped file can't be closed, some data are still using it")
+        self.mappings = []
+
     def debug_missing(self):
         keys = [
                 'scene',
@@ -23,7 +23,6 @@
 
 import bpy
 import os
-import base64
 import tempfile
 from os.path import dirname, join, isfile
 from ..buffer import *
@@ -43,14 +42,14 @@ class Image():
             if self.json['uri'][:5] == 'data:':
                 idx = self.json['uri'].find(sep)
                 if idx != -1:
-                    data = self.json['uri'][idx+len(sep):]
-                    self.data = base64.b64decode(data)
+                    self.data = decode_base64(self.json['uri'], idx+len(sep))
+                    # Release the uri string, only decoded data are needed now
+                    del self.json['uri']
                     return
 
             if isfile(join(dirname(self.gltf.filename), self.json['uri'])):
-                with open(join(dirname(self.gltf.filename), self.json['uri']), 'rb') as f_:
-                    self.data = f_.read()
-                    return
+                self.data = self.gltf.read_file(self.json['uri'])
+                return
             else:
                 self.gltf.log.error("Missing file (index " + str(self.index) + "): " + self.json['uri'])
                 return
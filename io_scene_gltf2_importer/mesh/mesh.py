@@ -22,7 +22,7 @@
  """
 
 import bpy
-import bmesh
+import numpy as np
 
 from .primitive import *
 from ..rig import *
@@ -36,6 +36,7 @@ class Mesh():
         self.target_weights = []
         self.name = None
         self.skin = None
+        self.blender_mesh = None
 
 
     def read(self):
@@ -85,27 +86,68 @@ class Mesh():
         verts = []
         edges = []
         faces = []
+        offset = 0
         for prim in self.primitives:
-            verts, edges, faces = prim.blender_create(verts, edges, faces)
+            prim_verts, prim_edges, prim_faces = prim.blender_create(offset)
+            verts.append(prim_verts)
+            edges.append(prim_edges)
+            faces.append(prim_faces)
+            offset += prim.vertices_length
+
+        verts = np.concatenate(verts)
+        edges = np.concatenate(edges)
+        faces = np.concatenate(faces)
+
+        # Bulk creation, arrays types must match Blender ones (float32 / int32) to avoid conversions
+        mesh.vertices.add(len(verts))
+        mesh.vertices.foreach_set('co', verts.ravel())
+
+        # Loose edges of line primitives, faces edges are computed by update()
+        mesh.edges.add(len(edges))
+        mesh.edges.foreach_set('vertices', edges.ravel())
+
+        mesh.loops.add(faces.size)
+        mesh.loops.foreach_set('vertex_index', faces.ravel())
+
+        mesh.polygons.add(len(faces))
+        mesh.polygons.foreach_set('loop_start', np.arange(0, faces.size, 3, dtype=np.int32))
+        mesh.polygons.foreach_set('loop_total', np.full(len(faces), 3, dtype=np.int32))
 
-        mesh.from_pydata(verts, edges, faces)
+        mesh.update(calc_edges=True)
         mesh.validate()
 
+        self.blender_mesh = mesh.name
         return mesh
 
     def blender_set_mesh(self, mesh, obj):
 
-        # Normals
-        offset = 0
-        for prim in self.primitives:
-            offset = prim.blender_set_normals(mesh, offset)
+        # Normals, set as custom split normals for all primitives at once
+        if len([prim for prim in self.primitives if 'NORMAL' in prim.attributes.keys()]) > 0:
+            normals = np.concatenate([prim.blender_normals() for prim in self.primitives])
+            mesh.polygons.foreach_set('use_smooth', [True] * len(mesh.polygons))
+            mesh.normals_split_custom_set_from_vertices(normals)
+            mesh.use_auto_smooth = True
 
         mesh.update()
 
-        # manage UV
-        offset = 0
+        # manage UV : gather per loop values from per vertex ones
+        loop_vertices = np.empty(len(mesh.loops), dtype=np.int32)
+        mesh.loops.foreach_get('vertex_index', loop_vertices)
+
+        texcoords = set()
         for prim in self.primitives:
-            offset = prim.blender_set_UV(obj, mesh, offset)
+            texcoords.update([attr for attr in prim.attributes.keys() if attr[:9] == "TEXCOORD_"])
+
+        for texcoord in sorted(texcoords):
+            if not texcoord in mesh.uv_textures:
+                mesh.uv_textures.new(texcoord)
+
+            for prim in self.primitives:
+                if texcoord in prim.attributes.keys():
+                    prim.blender_texcoord[int(texcoord[9:])] = texcoord
+
+            uvs = np.concatenate([prim.blender_uvs(texcoord) for prim in self.primitives])
+            mesh.uv_layers[texcoord].data.foreach_set('uv', uvs[loop_vertices].ravel())
 
         mesh.update()
 
@@ -113,17 +155,21 @@ class Mesh():
         for prim in self.primitives:
             prim.blender_set_UV_in_mat(obj)
 
-        # Assign materials to mesh
-        offset = 0
-        cpt_index_mat = 0
-        bm = bmesh.new()
-        bm.from_mesh(obj.data)
-        bm.faces.ensure_lookup_table()
+        # Assign materials to mesh, primitives sharing a material share a slot
+        material_slots = {}
+        prim_slots = []
         for prim in self.primitives:
-            offset, cpt_index_mat = prim.blender_assign_material(obj, bm, offset, cpt_index_mat)
-
-        bm.to_mesh(obj.data)
-        bm.free()
+            if prim.mat.blender_material not in material_slots.keys():
+                material_slots[prim.mat.blender_material] = len(material_slots)
+                obj.data.materials.append(bpy.data.materials[prim.mat.blender_material])
+            prim_slots.append(material_slots[prim.mat.blender_material])
+
+        # Primitive of each polygon is found from its first vertex, as validate() may have removed polygons
+        loop_starts = np.empty(len(mesh.polygons), dtype=np.int32)
+        mesh.polygons.foreach_get('loop_start', loop_starts)
+        prim_ends = np.cumsum([prim.vertices_length for prim in self.primitives])
+        polygon_prims = np.searchsorted(prim_ends, loop_vertices[loop_starts], side='right')
+        mesh.polygons.foreach_set('material_index', np.array(prim_slots, dtype=np.int32)[polygon_prims])
 
         # Create shapekeys if needed
         max_shape_to_create = 0
@@ -134,31 +180,15 @@ class Mesh():
         # Create basis shape key
         if max_shape_to_create > 0:
             obj.shape_key_add("Basis")
+            basis = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+            mesh.vertices.foreach_get('co', basis)
+            basis = basis.reshape(-1, 3)
 
+        # Each target is basis + deltas of all primitives, written at once
         for i in range(max_shape_to_create):
-
-            obj.shape_key_add("target_" + str(i))
-
-            for prim in self.primitives:
-                if i > len(prim.targets):
-                    continue
-
-                bm = bmesh.new()
-                bm.from_mesh(mesh)
-
-                shape_layer = bm.verts.layers.shape[i+1]
-                vert_idx = 0
-                for vert in bm.verts:
-                    shape = vert[shape_layer]
-                    co = self.gltf.convert.location(list(prim.targets[i]['POSITION']['result'][vert_idx]))
-                    shape.x = obj.data.vertices[vert_idx].co.x + co[0]
-                    shape.y = obj.data.vertices[vert_idx].co.y + co[1]
-                    shape.z = obj.data.vertices[vert_idx].co.z + co[2]
-
-                    vert_idx += 1
-
-                bm.to_mesh(obj.data)
-                bm.free()
+            key_block = obj.shape_key_add("target_" + str(i))
+            deltas = np.concatenate([prim.blender_target_deltas(i) for prim in self.primitives])
+            key_block.data.foreach_set('co', (basis + deltas).ravel())
 
         # set default weights for shape keys, and names
         for i in range(max_shape_to_create):
@@ -168,28 +198,23 @@ class Mesh():
                    obj.data.shape_keys.key_blocks[i+1].name  = self.primitives[0].targets[i]['POSITION']['accessor'].name
 
 
-        # Apply vertex color.
-        vertex_color = None
-        offset = 0
+        # Apply vertex colors, gathered per loop from per vertex ones
+        colors_names = set()
         for prim in self.primitives:
-            if 'COLOR_0' in prim.attributes.keys():
-                # Create vertex color, once only per object
-                if vertex_color is None:
-                    vertex_color = obj.data.vertex_colors.new("COLOR_0")
-
-                color_data = prim.attributes['COLOR_0']['result']
-
-                for poly in mesh.polygons:
-                    for loop_idx in range(poly.loop_start, poly.loop_start + poly.loop_total):
-                        vert_idx = mesh.loops[loop_idx].vertex_index
-                        if vert_idx in range(offset, offset + prim.vertices_length):
-                            if offset != 0:
-                                cpt_idx = vert_idx % offset
-                            else:
-                                cpt_idx = vert_idx
-                            vertex_color.data[loop_idx].color = color_data[cpt_idx][0:3]
-                            #TODO : no alpha in vertex color
-            offset = offset + prim.vertices_length
+            colors_names.update([attr for attr in prim.attributes.keys() if attr[:6] == "COLOR_"])
+
+        for color_name in sorted(colors_names):
+            vertex_color = obj.data.vertex_colors.new(color_name)
+            colors = np.concatenate([prim.blender_colors(color_name) for prim in self.primitives])[loop_vertices]
+
+            if len(vertex_color.data) > 0 and len(vertex_color.data[0].color) == 4:
+                vertex_color.data.foreach_set('color', colors.ravel())
+            else:
+                # Vertex colors have no alpha on this Blender version, store alpha in its own layer
+                vertex_color.data.foreach_set('color', colors[:, 0:3].ravel())
+                if len([prim for prim in self.primitives if prim.has_alpha(color_name)]) > 0:
+                    alpha_color = obj.data.vertex_colors.new(color_name + "_ALPHA")
+                    alpha_color.data.foreach_set('color', np.repeat(colors[:, 3:4], 3, axis=1).ravel())
 
     def debug_missing(self):
         keys = [
@@ -24,9 +24,18 @@
 from ..buffer import *
 from ..material import *
 
-from mathutils import Vector
+import numpy as np
 
 class Primitive():
+
+    POINTS         = 0
+    LINES          = 1
+    LINE_LOOP      = 2
+    LINE_STRIP     = 3
+    TRIANGLES      = 4
+    TRIANGLE_STRIP = 5
+    TRIANGLE_FAN   = 6
+
     def __init__(self, index, json, gltf):
         self.index = index
         self.json  = json  # Primitive json
@@ -38,24 +47,26 @@ class Primitive():
 
     def read(self):
 
+        if 'mode' in self.json.keys():
+            self.mode = self.json['mode']
+        else:
+            self.mode = self.TRIANGLES
+
         # reading attributes
         if 'attributes' in self.json.keys():
             for attr in self.json['attributes'].keys():
                 self.gltf.log.debug("Primitive attribute " + attr)
                 self.attributes[attr] = {}
-                self.attributes[attr]['accessor'] = Accessor(self.json['attributes'][attr], self.gltf.json['accessors'][self.json['attributes'][attr]], self.gltf)
-                self.attributes[attr]['result']   = self.attributes[attr]['accessor'].read()
-                self.attributes[attr]['accessor'].debug_missing()
+                self.attributes[attr]['accessor'] = self.gltf.read_accessor(self.json['attributes'][attr])
+                self.attributes[attr]['result']   = self.float_attribute(attr, self.attributes[attr]['accessor'].data)
 
         # reading indices
         if 'indices' in self.json.keys():
             self.gltf.log.debug("Primitive indices")
-            self.accessor = Accessor(self.json['indices'], self.gltf.json['accessors'][self.json['indices']], self.gltf)
-            self.indices  = self.accessor.read()
-            self.indices  = [ind[0] for ind in self.indices]
-            self.accessor.debug_missing()
+            self.accessor = self.gltf.read_accessor(self.json['indices'])
+            self.indices  = self.accessor.data[:, 0]
         else:
-            self.indices = range(0, len(self.attributes['POSITION']['result']))
+            self.indices = np.arange(0, len(self.attributes['POSITION']['result']))
 
 
         # reading materials
@@ -96,26 +107,24 @@ class Primitive():
                 target = {}
                 for attr in targ.keys():
                     target[attr] = {}
-                    target[attr]['accessor'] = Accessor(targ[attr], self.gltf.json['accessors'][targ[attr]], self.gltf)
-                    target[attr]['result']   = target[attr]['accessor'].read()
-                    target[attr]['accessor'].debug_missing()
+                    target[attr]['accessor'] = self.gltf.read_accessor(targ[attr])
+                    target[attr]['result']   = self.float_attribute(attr, target[attr]['accessor'].data)
                 self.targets.append(target)
 
 
-    def blender_create(self, verts, edges, faces):
-        # TODO mode of primitive 4 for now.
-        current_length = len(verts)
-        prim_verts = [self.gltf.convert.location(vert) for vert in self.attributes['POSITION']['result']]
+    def float_attribute(self, attr, data):
+        # KHR_mesh_quantization : geometry attributes may be stored as non normalized integers
+        if attr in ['POSITION', 'NORMAL', 'TANGENT'] or attr[:9] == "TEXCOORD_":
+            return data.astype(np.float32, copy=False)
+        return data
+
+    def blender_create(self, offset):
+        prim_verts = self.gltf.convert.locations(self.attributes['POSITION']['result'])
         self.vertices_length = len(prim_verts)
-        verts.extend(prim_verts)
-        prim_faces = []
-        for i in range(0, len(self.indices), 3):
-            vals = self.indices[i:i+3]
-            new_vals = []
-            for y in vals:
-                new_vals.append(y+current_length)
-            prim_faces.append(tuple(new_vals))
-        faces.extend(prim_faces)
+
+        prim_edges, prim_faces = self.blender_topology()
+        prim_edges = prim_edges + offset
+        prim_faces = prim_faces + offset
         self.faces_length = len(prim_faces)
 
         # manage material of primitive
@@ -125,36 +134,93 @@ class Primitive():
             if not self.mat.blender_material:
                 self.mat.create_blender()
 
-        return verts, edges, faces
+        return prim_verts, prim_edges, prim_faces
 
-    def blender_set_normals(self, mesh, offset):
+    def blender_topology(self):
+        # Expand primitive mode into edges and triangles
+        indices = self.indices.astype(np.int32)
+        edges = np.empty((0, 2), dtype=np.int32)
+        faces = np.empty((0, 3), dtype=np.int32)
+
+        if self.mode == self.LINES:
+            edges = indices[:len(indices) - len(indices) % 2].reshape(-1, 2)
+        elif self.mode == self.LINE_LOOP:
+            edges = np.column_stack((indices, np.roll(indices, -1)))
+        elif self.mode == self.LINE_STRIP:
+            edges = np.column_stack((indices[:-1], indices[1:]))
+        elif self.mode == self.TRIANGLES:
+            faces = indices[:len(indices) - len(indices) % 3].reshape(-1, 3)
+        elif self.mode == self.TRIANGLE_STRIP:
+            if len(indices) > 2:
+                # Odd triangles have their winding order reversed
+                i = np.arange(len(indices) - 2)
+                odd = i % 2
+                faces = np.column_stack((indices[i], indices[i + 1 + odd], indices[i + 2 - odd]))
+        elif self.mode == self.TRIANGLE_FAN:
+            if len(indices) > 2:
+                faces = np.column_stack((indices[1:-1], indices[2:], np.full(len(indices) - 2, indices[0], dtype=np.int32)))
+        elif self.mode != self.POINTS:
+            self.gltf.log.error("Unknown primitive mode " + str(self.mode))
+
+        # Remove degenerate elements (used to restart strips), Blender would remove them anyway
+        edges = edges[edges[:, 0] != edges[:, 1]]
+        faces = faces[(faces[:, 0] != faces[:, 1]) & (faces[:, 1] != faces[:, 2]) & (faces[:, 0] != faces[:, 2])]
+
+        return edges, faces
+
+    def blender_normals(self):
         if 'NORMAL' in self.attributes.keys():
-            for poly in mesh.polygons:
-                for loop_idx in range(poly.loop_start, poly.loop_start + poly.loop_total):
-                    vert_idx = mesh.loops[loop_idx].vertex_index
-                    if vert_idx in range(offset, offset + self.vertices_length):
-                        if offset != 0:
-                            cpt_vert = vert_idx % offset
-                        else:
-                            cpt_vert = vert_idx
-                        mesh.vertices[vert_idx].normal = self.attributes['NORMAL']['result'][cpt_vert]
-        offset = offset + self.vertices_length
-        return offset
-
-    def blender_set_UV(self, obj, mesh, offset):
-        for texcoord in [attr for attr in self.attributes.keys() if attr[:9] == "TEXCOORD_"]:
-            if not texcoord in mesh.uv_textures:
-                mesh.uv_textures.new(texcoord)
-                self.blender_texcoord[int(texcoord[9:])] = texcoord
-
-            for poly in mesh.polygons:
-                for loop_idx in range(poly.loop_start, poly.loop_start + poly.loop_total):
-                    vert_idx = mesh.loops[loop_idx].vertex_index
-                    if vert_idx in range(offset, offset + self.vertices_length):
-                        obj.data.uv_layers[texcoord].data[loop_idx].uv = Vector((self.attributes[texcoord]['result'][vert_idx-offset][0], 1-self.attributes[texcoord]['result'][vert_idx-offset][1]))
-
-        offset = offset + self.vertices_length
-        return offset
+            return self.gltf.convert.locations(self.attributes['NORMAL']['result'])
+
+        # Null custom normals are replaced by default ones
+        return np.zeros((self.vertices_length, 3), dtype=np.float32)
+
+    def blender_uvs(self, texcoord):
+        if texcoord not in self.attributes.keys():
+            return np.zeros((self.vertices_length, 2), dtype=np.float32)
+
+        # glTF origin is top left, Blender one is bottom left
+        uvs = np.array(self.attributes[texcoord]['result'], dtype=np.float32)
+        uvs[:, 1] = 1 - uvs[:, 1]
+        return uvs
+
+    def blender_colors(self, color_name):
+        if color_name not in self.attributes.keys():
+            return np.ones((self.vertices_length, 4), dtype=np.float32)
+
+        colors = self.attributes[color_name]['result']
+        if colors.dtype.kind in ['i', 'u']:
+            # Integer colors are always normalized, even if not flagged as such
+            colors = colors / float(np.iinfo(colors.dtype).max)
+
+        if colors.shape[1] == 3:
+            colors = np.hstack((colors, np.ones((self.vertices_length, 1))))
+
+        return colors.astype(np.float32)
+
+    def blender_skin(self):
+        # All JOINTS_n / WEIGHTS_n sets, merged in (N, 4k) arrays
+        joints  = []
+        weights = []
+        set_idx = 0
+        while 'JOINTS_' + str(set_idx) in self.attributes.keys() and 'WEIGHTS_' + str(set_idx) in self.attributes.keys():
+            joints.append(self.attributes['JOINTS_' + str(set_idx)]['result'])
+            weights.append(self.attributes['WEIGHTS_' + str(set_idx)]['result'])
+            set_idx += 1
+
+        if len(joints) == 0:
+            return None, None
+
+        return np.hstack(joints).astype(np.int32), np.hstack(weights).astype(np.float32)
+
+    def has_alpha(self, color_name):
+        return color_name in self.attributes.keys() and self.attributes[color_name]['result'].shape[1] == 4
+
+    def blender_target_deltas(self, target_idx):
+        if target_idx >= len(self.targets) or 'POSITION' not in self.targets[target_idx].keys():
+            return np.zeros((self.vertices_length, 3), dtype=np.float32)
+
+        return self.gltf.convert.locations(self.targets[target_idx]['POSITION']['result'])
 
     def blender_set_UV_in_mat(self, obj):
         if hasattr(self.mat, "KHR_materials_pbrSpecularGlossiness"):
@@ -171,32 +237,18 @@ class Primitive():
                 if self.mat.pbr.metallic_type in [self.mat.pbr.TEXTURE, self.mat.pbr.TEXTURE_FACTOR] :
                     self.mat.set_uvmap(self, obj)
 
-    def blender_assign_material(self, obj, bm, offset, cpt_index_mat):
-        obj.data.materials.append(bpy.data.materials[self.mat.blender_material])
-        for vert in bm.verts:
-            if vert.index in range(offset, offset + self.vertices_length):
-                for loop in vert.link_loops:
-                    face = loop.face.index
-                    bm.faces[face].material_index = cpt_index_mat
-        cpt_index_mat += 1
-        offset = offset + self.vertices_length
-        return offset, cpt_index_mat
-
     def debug_missing(self):
         keys = [
                 'indices',
                 'attributes',
                 'material',
+                'mode',
                 'targets'
                 ]
 
         keys_attr = [
                 'POSITION',
-                'NORMAL',
-                'TEXCOORD_0',
-                'TEXCOORD_1',
-                'JOINTS_0',
-                'WEIGHTS_0'
+                'NORMAL'
         ]
 
         for key in self.json.keys():
@@ -205,5 +257,5 @@ class Primitive():
 
         if 'attributes' in self.json.keys():
             for attr in self.json['attributes'].keys():
-                if attr not in keys_attr:
+                if attr not in keys_attr and attr.split('_')[0] not in ['TEXCOORD', 'COLOR', 'JOINTS', 'WEIGHTS']:
                     self.gltf.log.debug("PRIMITIVE MISSING attribute " + attr)
@@ -55,12 +55,26 @@ class Node():
         self.transform = self.get_transforms()
 
         if 'mesh' in self.json.keys():
-            self.mesh = Mesh(self.json['mesh'], self.gltf.json['meshes'][self.json['mesh']], self.gltf)
-            self.mesh.read()
-            self.mesh.debug_missing()
-
+            # Meshes are read once per mesh / skin, and shared between nodes
+            # Shape keys are on mesh, so nodes with their own morph weights have their own mesh
             if 'skin' in self.json.keys():
-                self.mesh.rig(self.json['skin'], self.index)
+                mesh_key = (self.json['mesh'], self.json['skin'])
+            else:
+                mesh_key = (self.json['mesh'], None)
+            if self.index in self.gltf.morph_nodes:
+                mesh_key = mesh_key + (self.index,)
+
+            if mesh_key not in self.gltf.meshes.keys():
+                mesh = Mesh(self.json['mesh'], self.gltf.json['meshes'][self.json['mesh']], self.gltf)
+                mesh.read()
+                mesh.debug_missing()
+
+                if 'skin' in self.json.keys():
+                    mesh.rig(self.json['skin'], self.index)
+
+                self.gltf.meshes[mesh_key] = mesh
+
+            self.mesh = self.gltf.meshes[mesh_key]
 
         if 'camera' in self.json.keys():
             self.camera = Camera(self.json['camera'], self.name, self.gltf.json['cameras'][self.json['camera']], self.gltf)
@@ -87,7 +101,7 @@ class Node():
 
 
         if 'scale' in self.json.keys():
-            s = self.json['scale']
+            s = self.gltf.convert.scale(self.json['scale'])
             mat = Matrix([
                 [s[0], 0, 0, 0],
                 [0, s[1], 0, 0],
@@ -111,42 +125,50 @@ class Node():
             obj.matrix_world =  self.transform
             return
 
-        for node in self.gltf.scene.nodes.values(): # TODO if parent is in another scene
-            if node.index == parent:
-                if node.is_joint == True:
-                    delta = Quaternion((0.7071068286895752, 0.7071068286895752, 0.0, 0.0))
-                    obj.matrix_world = self.transform * delta.inverted().to_matrix().to_4x4()
-                    return
-                else:
-                    obj.matrix_world = self.transform
-                    return
-
-
+        node = self.scene.nodes[parent]
+        if node.is_joint == True:
+            delta = Quaternion((0.7071068286895752, 0.7071068286895752, 0.0, 0.0))
+            obj.matrix_world = self.transform * delta.inverted().to_matrix().to_4x4()
+        else:
+            obj.matrix_world = self.transform
+
+    def get_blender_world_matrix(self, obj):
+        # matrix_world is only updated by a scene update, so compute it from the whole parent chain
+        mat = obj.matrix_basis
+        while obj.parent is not None:
+            mat = obj.matrix_parent_inverse * mat
+            if obj.parent_type == 'BONE':
+                bone = obj.parent.data.bones[obj.parent_bone]
+                mat = bone.matrix_local * Matrix.Translation(Vector((0.0, bone.length, 0.0))) * mat
+            obj = obj.parent
+            mat = obj.matrix_basis * mat
+        return mat
 
     def set_blender_parent(self, obj, parent):
 
         if parent is None:
             return
 
-        for node in self.gltf.scene.nodes.values(): # TODO if parent is in another scene
-            if node.index == parent:
-                if node.is_joint == True:
-                    bpy.ops.object.select_all(action='DESELECT')
-                    bpy.data.objects[node.blender_armature_name].select = True
-                    bpy.context.scene.objects.active = bpy.data.objects[node.blender_armature_name]
-                    bpy.ops.object.mode_set(mode='EDIT')
-                    bpy.data.objects[node.blender_armature_name].data.edit_bones.active = bpy.data.objects[node.blender_armature_name].data.edit_bones[node.blender_bone_name]
-                    bpy.ops.object.mode_set(mode='OBJECT')
-                    bpy.ops.object.select_all(action='DESELECT')
-                    obj.select = True
-                    bpy.data.objects[node.blender_armature_name].select = True
-                    bpy.context.scene.objects.active = bpy.data.objects[node.blender_armature_name]
-                    bpy.ops.object.parent_set(type='BONE', keep_transform=True)
-
-                    return
-                if node.blender_object:
-                    obj.parent = bpy.data.objects[node.blender_object]
-                    return
+        if parent not in self.scene.nodes.keys():
+            self.gltf.log.error("ERROR, parent not found")
+            return
+
+        node = self.scene.nodes[parent]
+        if node.is_joint == True:
+            armature = bpy.data.objects[node.blender_armature_name]
+            bone = armature.data.bones[node.blender_bone_name]
+            obj.parent = armature
+            obj.parent_type = 'BONE'
+            obj.parent_bone = bone.name
+
+            # Keep transform : bone parenting is relative to bone tail
+            parent_mat = self.get_blender_world_matrix(armature) * bone.matrix_local * Matrix.Translation(Vector((0.0, bone.length, 0.0)))
+            obj.matrix_parent_inverse = parent_mat.inverted()
+
+            return
+        if node.blender_object:
+            obj.parent = bpy.data.objects[node.blender_object]
+            return
 
         self.gltf.log.error("ERROR, parent not found")
 
@@ -167,7 +189,13 @@ class Node():
                 else:
                     name = "Object_" + str(self.index)
 
-            mesh = self.mesh.blender_create(parent)
+            # Blender mesh is created once, then linked to all objects using it
+            if self.mesh.blender_mesh is None:
+                mesh = self.mesh.blender_create(parent)
+                new_mesh = True
+            else:
+                mesh = bpy.data.meshes[self.mesh.blender_mesh]
+                new_mesh = False
 
             obj = bpy.data.objects.new(name, mesh)
             obj.rotation_mode = 'QUATERNION'
@@ -176,7 +204,8 @@ class Node():
             self.blender_object = obj.name
             self.set_blender_parent(obj, parent)
 
-            self.mesh.blender_set_mesh(mesh, obj)
+            if new_mesh:
+                self.mesh.blender_set_mesh(mesh, obj)
 
             for child in self.children:
                 child.blender_create(self.index)
@@ -202,11 +231,10 @@ class Node():
             else:
                 self.gltf.log.info("Blender create Bone node")
             # Check if corresponding armature is already created, create it if needed
+            # All bones of the armature are created with it
             if self.gltf.skins[self.skin_id].blender_armature_name is None:
                 self.gltf.skins[self.skin_id].create_blender_armature(parent)
 
-            self.gltf.skins[self.skin_id].create_bone(self, parent)
-
             for child in self.children:
                 child.blender_create(self.index)
 
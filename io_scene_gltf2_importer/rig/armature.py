@@ -22,7 +22,8 @@
  """
 
 import bpy
-from mathutils import Vector, Matrix, Quaternion
+import numpy as np
+from mathutils import Vector, Matrix
 from ..buffer import *
 
 class Skin():
@@ -34,6 +35,7 @@ class Skin():
         self.bones = []
         self.blender_armature_name = None
         self.mesh_id = None
+        self.inverseBindMatrices = None
 
     def read(self):
         if 'skeleton' in self.json.keys():
@@ -46,9 +48,8 @@ class Skin():
             self.name = self.json['name']
 
         if 'inverseBindMatrices' in self.json.keys():
-            self.inverseBindMatrices = Accessor(self.json['inverseBindMatrices'], self.gltf.json['accessors'][self.json['inverseBindMatrices']], self.gltf)
-            self.data = self.inverseBindMatrices.read()
-            self.inverseBindMatrices.debug_missing()
+            self.inverseBindMatrices = self.gltf.read_accessor(self.json['inverseBindMatrices'])
+            self.data = self.inverseBindMatrices.data
 
     def create_blender_armature(self, parent):
         if self.name is not None:
@@ -56,6 +57,8 @@ class Skin():
         else:
             name = "Armature_" + str(self.index)
 
+        self.compute_bone_matrices(parent)
+
         armature = bpy.data.armatures.new(name)
         obj = bpy.data.objects.new(name, armature)
         bpy.data.scenes[self.gltf.blender.scene].objects.link(obj)
@@ -63,31 +66,18 @@ class Skin():
         if parent:
             obj.parent = bpy.data.objects[self.gltf.scene.nodes[parent].blender_object]
 
+        self.create_bones()
 
-    def set_bone_transforms(self, bone, node, parent):
-        obj   = bpy.data.objects[self.blender_armature_name]
-        delta = Quaternion((0.7071068286895752, 0.7071068286895752, 0.0, 0.0))
-
-        mat = Matrix()
-        if not parent:
-            transform = node.get_transforms()
-            mat = transform * delta.to_matrix().to_4x4()
-        else:
-            if not self.gltf.scene.nodes[parent].is_joint: # TODO if Node in another scene
-                transform  = node.get_transforms()
-                mat = transform * delta.to_matrix().to_4x4()
-            else:
-                transform = node.get_transforms()
-                parent_mat = obj.data.edit_bones[self.gltf.scene.nodes[parent].blender_bone_name].matrix # Node in another scene
-
-                mat = (parent_mat.to_quaternion() * delta.inverted() * transform.to_quaternion() * delta).to_matrix().to_4x4()
-                mat = Matrix.Translation(parent_mat.to_translation() + ( parent_mat.to_quaternion() * delta.inverted() * transform.to_translation() )) * mat
-                #TODO scaling of bones
+    def get_joint_nodes(self):
+        # Nodes having a bone in this armature, parents before children
+        nodes = [node for node in self.gltf.scene.nodes.values() if node.is_joint and node.skin_id == self.index]
+        nodes.sort(key=lambda node: self.gltf.get_node_depth(node.index))
+        return nodes
 
-        bone.matrix = mat
-        return bone.matrix
+    def create_bones(self):
+        # All bones are created in a single edit mode session
+        nodes = self.get_joint_nodes()
 
-    def create_bone(self, node, parent):
         scene = bpy.data.scenes[self.gltf.blender.scene]
         obj   = bpy.data.objects[self.blender_armature_name]
 
@@ -95,6 +85,69 @@ class Skin():
         scene.objects.active = obj
         bpy.ops.object.mode_set(mode="EDIT")
 
+        for node in nodes:
+            if node.index in self.gltf.node_parents.keys():
+                self.create_bone(node, self.gltf.node_parents[node.index])
+            else:
+                self.create_bone(node, None)
+
+        bpy.ops.object.mode_set(mode="OBJECT")
+
+    def get_world_matrix(self, node_id):
+        # World matrix of a node, from node hierarchy
+        mat = np.identity(4, dtype=np.float32)
+        while node_id is not None:
+            node = self.gltf.get_node(node_id)
+            if node is not None:
+                mat = np.matmul(np.array(node.transform, dtype=np.float32), mat)
+            node_id = self.gltf.node_parents.get(node_id)
+        return mat
+
+    def compute_bone_matrices(self, parent):
+        # Rest pose of all bones, in armature space, computed at once before Blender data creation
+        nodes = self.get_joint_nodes()
+        if len(nodes) == 0:
+            return
+
+        # Current pose, from node hierarchy. Parents are before children
+        node_rows = {node.index: row for row, node in enumerate(nodes)}
+        parents = np.array([node_rows.get(self.gltf.node_parents.get(node.index), -1) for node in nodes])
+        depths  = np.array([self.gltf.get_node_depth(node.index) for node in nodes])
+        mats = np.array([np.array(node.transform, dtype=np.float32) for node in nodes])
+        for depth in np.unique(depths):
+            level = np.flatnonzero((depths == depth) & (parents >= 0))
+            mats[level] = np.matmul(mats[parents[level]], mats[level])
+
+        if self.inverseBindMatrices is not None:
+            # Bind pose, from mesh space to armature space, for nodes having an inverse bind matrix
+            bone_rows = {joint: row for row, joint in enumerate(self.bones)}
+            rows = [row for row, node in enumerate(nodes) if node.index in bone_rows.keys()]
+            if len(rows) > 0:
+                joints = [bone_rows[nodes[row].index] for row in rows]
+                bind = np.linalg.inv(self.gltf.convert.matrices(self.data[joints]))
+                space = self.get_world_matrix(self.mesh_id)
+                if parent is not None:
+                    space = np.matmul(np.linalg.inv(self.get_world_matrix(parent)), space)
+                mats[rows] = np.matmul(space, bind)
+
+        # Bones are not scaled, and Y axis of bones is glTF Z axis
+        #TODO scaling of bones
+        rot = mats[:, :3, :3]
+        mats[:, :3, :3] = rot / np.linalg.norm(rot, axis=1, keepdims=True)
+        delta = np.array([
+            [1, 0,  0, 0],
+            [0, 0, -1, 0],
+            [0, 1,  0, 0],
+            [0, 0,  0, 1]
+        ], dtype=np.float32)
+        mats = np.matmul(mats, delta)
+
+        for node, mat in zip(nodes, mats.tolist()):
+            node.blender_bone_matrix = Matrix(mat)
+
+    def create_bone(self, node, parent):
+        obj   = bpy.data.objects[self.blender_armature_name]
+
         if node.name:
             name = node.name
         else:
@@ -104,15 +157,12 @@ class Skin():
         node.blender_bone_name = bone.name
         node.blender_armature_name = self.blender_armature_name
         bone.tail = Vector((0.0,1.0,0.0)) # Needed to keep bone alive
-        mat = self.set_bone_transforms(bone, node, parent)
-        node.blender_bone_matrix = mat
+        bone.matrix = node.blender_bone_matrix
 
         # Set parent
         if parent is not None and hasattr(self.gltf.scene.nodes[parent], "blender_bone_name"):
             bone.parent = obj.data.edit_bones[self.gltf.scene.nodes[parent].blender_bone_name] #TODO if in another scene
 
-        bpy.ops.object.mode_set(mode="OBJECT")
-
     def create_vertex_groups(self):
         obj = bpy.data.objects[self.gltf.scene.nodes[self.mesh_id].blender_object]
         for bone in self.bones:
@@ -122,46 +172,87 @@ class Skin():
         node = self.gltf.scene.nodes[self.mesh_id]
         obj = bpy.data.objects[node.blender_object]
 
+        # Gather vertex / joint / weight of all primitives
+        vertices = []
+        joints   = []
+        weights  = []
         offset = 0
         for prim in node.mesh.primitives:
-            if 'JOINTS_0' in prim.attributes.keys() and 'WEIGHTS_0' in prim.attributes.keys():
-
-                joint_ = prim.attributes['JOINTS_0']['result']
-                weight_ = prim.attributes['WEIGHTS_0']['result']
-
-                for poly in obj.data.polygons:
-                    for loop_idx in range(poly.loop_start, poly.loop_start + poly.loop_total):
-                        vert_idx = obj.data.loops[loop_idx].vertex_index
-                        if vert_idx in range(offset, offset + prim.vertices_length):
-
-                            if offset != 0:
-                                tab_index = vert_idx % offset
-                            else:
-                                tab_index = vert_idx
-
-                            cpt = 0
-                            for joint_idx in joint_[tab_index]:
-                                weight_val = weight_[tab_index][cpt]
-                                if weight_val != 0.0:   # It can be a problem to assign weights of 0
-                                                        # for bone index 0, if there is always 4 indices in joint_ tuple
-                                    group = obj.vertex_groups[self.gltf.scene.nodes[self.bones[joint_idx]].blender_bone_name]
-                                    group.add([vert_idx], weight_val, 'REPLACE')
-                                cpt += 1
+            joint_, weight_ = prim.blender_skin()
+            if joint_ is not None:
+                joint_, weight_ = self.prune_weights(joint_, weight_)
+
+                vertices.append(np.repeat(np.arange(offset, offset + prim.vertices_length), joint_.shape[1]))
+                joints.append(joint_.ravel())
+                weights.append(weight_.ravel())
             else:
                 self.gltf.log.error("No Skinning ?????") #TODO
 
-
             offset = offset + prim.vertices_length
 
+        if len(vertices) == 0:
+            return
+
+        vertices = np.concatenate(vertices)
+        joints   = np.concatenate(joints)
+        weights  = np.concatenate(weights)
+
+        # Weights are quantized, so that many vertices share the same joint / weight run
+        if self.gltf.weight_steps > 0:
+            weights = np.round(weights * self.gltf.weight_steps) / self.gltf.weight_steps
+
+        # It can be a problem to assign weights of 0
+        # for bone index 0, if there is always 4 indices in joint tuple
+        mask = weights != 0.0
+        vertices = vertices[mask]
+        joints   = joints[mask]
+        weights  = weights[mask]
+
+        if len(weights) == 0:
+            return
+
+        # Sort by joint then weight, so that each run of same joint / weight is added at once
+        order = np.lexsort((weights, joints))
+        vertices = vertices[order]
+        joints   = joints[order]
+        weights  = weights[order]
+
+        runs = np.flatnonzero((joints[1:] != joints[:-1]) | (weights[1:] != weights[:-1])) + 1
+        starts = [0] + runs.tolist()
+        ends   = runs.tolist() + [len(joints)]
+
+        groups = [obj.vertex_groups[self.gltf.scene.nodes[bone].blender_bone_name] for bone in self.bones]
+        for start, end in zip(starts, ends):
+            groups[joints[start]].add(vertices[start:end].tolist(), float(weights[start]), 'REPLACE')
+
+    def normalize_weights(self, weights):
+        totals = weights.sum(axis=1, keepdims=True)
+        totals[totals == 0.0] = 1.0
+        return weights / totals
+
+    def prune_weights(self, joints, weights):
+        # Keep the highest influences of each vertex, and drop insignificant ones
+        if self.gltf.max_influences > 0 and weights.shape[1] > self.gltf.max_influences:
+            rows  = np.arange(weights.shape[0])[:, np.newaxis]
+            order = np.argsort(-weights, axis=1, kind='mergesort')[:, :self.gltf.max_influences]
+            joints  = joints[rows, order]
+            weights = weights[rows, order]
+
+        weights = self.normalize_weights(weights)
+
+        if self.gltf.weight_threshold > 0.0:
+            # Largest influence of each vertex is always kept
+            dropped = weights < self.gltf.weight_threshold
+            dropped[np.arange(weights.shape[0]), weights.argmax(axis=1)] = False
+            weights[dropped] = 0.0
+            weights = self.normalize_weights(weights)
+
+        return joints, weights
+
     def create_armature_modifiers(self):
         node = self.gltf.scene.nodes[self.mesh_id]
         obj = bpy.data.objects[node.blender_object]
 
-        for obj_sel in bpy.context.scene.objects:
-            obj_sel.select = False
-        obj.select = True
-        bpy.context.scene.objects.active = obj
-
         #bpy.ops.object.parent_clear(type='CLEAR_KEEP_TRANSFORM')
         #obj.parent = bpy.data.objects[self.blender_armature_name]
         arma = obj.modifiers.new(name="Armature", type="ARMATURE")
@@ -27,6 +27,7 @@ from ..node import *
 
 class Scene():
     def __init__(self, index, json, gltf):
+        self.index = index
         self.json = json   # Scene json
         self.gltf = gltf # Reference to global glTF instance
         self.nodes = {}
@@ -21,6 +21,7 @@
  * This development is done in strong collaboration with Airbus Defence & Space
  """
 
+import numpy as np
 from mathutils import Matrix, Vector, Quaternion
 
 class Conversion():
@@ -31,7 +32,7 @@ class Conversion():
         mat_input =  Matrix([mat_input[0:4], mat_input[4:8], mat_input[8:12], mat_input[12:16]])
         mat_input.transpose()
 
-        s = mat_input.to_scale()
+        s = self.scale(mat_input.to_scale())
         rotation = mat_input.to_quaternion()
         location = mat_input.to_translation()
 
@@ -57,4 +58,25 @@ class Conversion():
         return [location[0], -location[2], location[1]]
 
     def scale(self, scale):
-        return scale # TODO test scale animation
+        return [scale[0], scale[2], scale[1]]
+
+    # Array versions, converting a whole accessor at once
+
+    def locations(self, locations):
+        # (N, 3) : (x, y, z) => (x, -z, y)
+        return locations[:, [0, 2, 1]] * np.array([1, -1, 1], dtype=np.float32)
+
+    def quaternions(self, quaternions):
+        # (N, 4) : glTF (x, y, z, w) => Blender (w, x, -z, y)
+        return quaternions[:, [3, 0, 2, 1]] * np.array([1, 1, -1, 1], dtype=np.float32)
+
+    def matrices(self, matrices):
+        # (N, 16) column major => (N, 4, 4) row major, with axis change applied on both sides
+        matrices = matrices.reshape(-1, 4, 4).transpose(0, 2, 1)
+        perm = [0, 2, 1, 3]
+        sign = np.array([1, -1, 1, 1], dtype=np.float32)
+        return matrices[:, perm][:, :, perm] * np.outer(sign, sign)
+
+    def scales(self, scales):
+        # (N, 3) : (x, y, z) => (x, z, y), scales have no sign change
+        return scales[:, [0, 2, 1]]